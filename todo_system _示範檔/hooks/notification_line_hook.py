@@ -1,20 +1,84 @@
 #!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#     "httpx",
+#     "orjson",
+#     "python-dotenv",
+# ]
+# ///
 """
 Claude Code Notification Hook - LINE 推播通知
 當 Claude Code 發送通知時，將訊息轉發到 LINE
+
+相依套件 (httpx、orjson、python-dotenv) 宣告於上方 PEP 723 區塊，可用 `uv run` 直接執行
 """
 
 import sys
-import json
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-import requests
 
+try:
+    from orjson import JSONDecodeError, loads as json_loads
+except ImportError:
+    # 未安裝 orjson 時退回標準函式庫 json
+    from json import JSONDecodeError, loads as json_loads
 
-def send_line_notification(message: str, access_token: str, user_id: str) -> bool:
+
+LINE_PUSH_URL = "https://api.line.me/v2/bot/message/push"
+MAX_CONCURRENT_PUSHES = 10  # 多位接收者時同時推播的上限
+
+# 已解析的 .env 快取: (檔案修改時間, 環境變數字典)
+_env_cache: tuple[int, dict[str, str | None]] | None = None
+
+# 共用的 HTTP 連線池；每次 hook 執行都是新的程序，只有同一程序內多次推播時才會沿用連線
+_client = None
+
+
+def load_env(env_path: Path):
     """
-    發送 LINE 推播訊息
+    載入 .env 檔案中的環境變數
+
+    解析結果會快取在模組層級，只有在檔案修改時間改變時才重新解析；
+    與 load_dotenv 相同，不會覆寫已存在的環境變數
+
+    Args:
+        env_path: .env 檔案路徑
+    """
+    global _env_cache
+
+    mtime = env_path.stat().st_mtime_ns
+    if _env_cache is None or _env_cache[0] != mtime:
+        from dotenv import dotenv_values
+        _env_cache = (mtime, dotenv_values(env_path))
+
+    for key, value in _env_cache[1].items():
+        if value is not None:
+            os.environ.setdefault(key, value)
+
+
+def get_http_client():
+    """
+    取得模組共用的 httpx.Client，第一次呼叫時才建立
+
+    Returns:
+        httpx.Client: 保持連線的 HTTP 客戶端
+    """
+    global _client
+
+    if _client is None:
+        # 延遲載入 httpx，非通知事件直接退出時不需要付出匯入成本
+        import httpx
+        _client = httpx.Client(
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=4),
+        )
+    return _client
+
+
+def build_push_request(message: str, access_token: str, user_id: str) -> tuple[dict, dict]:
+    """
+    建立 LINE 推播 API 的標頭與內容
 
     Args:
         message: 要發送的訊息內容
@@ -22,10 +86,8 @@ def send_line_notification(message: str, access_token: str, user_id: str) -> boo
         user_id: 接收訊息的 LINE User ID
 
     Returns:
-        bool: 發送成功返回 True，失敗返回 False
+        tuple: (headers, payload)
     """
-    url = "https://api.line.me/v2/bot/message/push"
-
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {access_token}"
@@ -41,22 +103,91 @@ def send_line_notification(message: str, access_token: str, user_id: str) -> boo
         ]
     }
 
+    return headers, payload
+
+
+def report_push_error(e: Exception, user_id: str):
+    """輸出推播失敗的錯誤訊息"""
+    print(f"❌ LINE 推播失敗 ({user_id}): {e}", file=sys.stderr)
+    if hasattr(e, 'response') and e.response is not None:
+        print(f"Response: {e.response.text}", file=sys.stderr)
+
+
+def send_line_notification(message: str, access_token: str, user_id: str) -> bool:
+    """
+    發送 LINE 推播訊息
+
+    Args:
+        message: 要發送的訊息內容
+        access_token: LINE Channel Access Token
+        user_id: 接收訊息的 LINE User ID
+
+    Returns:
+        bool: 發送成功返回 True，失敗返回 False
+    """
+    import httpx
+
+    headers, payload = build_push_request(message, access_token, user_id)
+
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = get_http_client().post(LINE_PUSH_URL, headers=headers, json=payload)
         response.raise_for_status()
         return True
-    except requests.exceptions.RequestException as e:
-        print(f"❌ LINE 推播失敗: {e}", file=sys.stderr)
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Response: {e.response.text}", file=sys.stderr)
+    except httpx.HTTPError as e:
+        report_push_error(e, user_id)
         return False
 
 
+async def send_line_notifications(message: str, access_token: str, user_ids: list[str]) -> list[bool]:
+    """
+    同時發送 LINE 推播訊息給多位接收者
+
+    Args:
+        message: 要發送的訊息內容
+        access_token: LINE Channel Access Token
+        user_ids: 接收訊息的 LINE User ID 列表
+
+    Returns:
+        list[bool]: 每位接收者是否發送成功
+    """
+    import asyncio
+    import httpx
+
+    # 限制同時進行的推播數量，避免觸發 LINE API 速率限制
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PUSHES)
+
+    async def push_one(client: httpx.AsyncClient, user_id: str) -> bool:
+        headers, payload = build_push_request(message, access_token, user_id)
+        async with semaphore:
+            try:
+                response = await client.post(LINE_PUSH_URL, headers=headers, json=payload)
+                response.raise_for_status()
+                return True
+            except httpx.HTTPError as e:
+                report_push_error(e, user_id)
+                return False
+
+    async with httpx.AsyncClient(
+        timeout=10,
+        limits=httpx.Limits(max_keepalive_connections=MAX_CONCURRENT_PUSHES),
+    ) as client:
+        results = await asyncio.gather(
+            *(push_one(client, user_id) for user_id in user_ids),
+            return_exceptions=True,
+        )
+
+    for user_id, result in zip(user_ids, results):
+        if isinstance(result, BaseException):
+            report_push_error(result, user_id)
+
+    return [result is True for result in results]
+
+
 def main():
     """主程式入口"""
     try:
         # 讀取從 stdin 傳入的 JSON 資料
-        input_data = sys.stdin.read()
+        input_data = sys.stdin.buffer.read()
 
         if not input_data.strip():
             print("⚠️  未收到輸入資料", file=sys.stderr)
@@ -64,8 +195,8 @@ def main():
 
         # 解析 JSON
         try:
-            event_data = json.loads(input_data)
-        except json.JSONDecodeError as e:
+            event_data = json_loads(input_data)
+        except JSONDecodeError as e:
             print(f"❌ JSON 解析失敗: {e}", file=sys.stderr)
             sys.exit(1)
 
@@ -97,25 +228,31 @@ def main():
             print("請建立 .env 檔案並設定 LINE_CHANNEL_ACCESS_TOKEN 和 LINE_USER_ID", file=sys.stderr)
             sys.exit(1)
 
-        load_dotenv(env_path)
+        load_env(env_path)
 
         # 讀取 LINE 設定
         access_token = os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
-        user_id = os.getenv("LINE_USER_ID")
+        # LINE_USER_ID 可用逗號分隔多位接收者
+        user_ids = [u.strip() for u in os.getenv("LINE_USER_ID", "").split(",") if u.strip()]
 
         if not access_token or access_token == "your_channel_access_token_here":
             print("❌ 請在 .env 檔案中設定 LINE_CHANNEL_ACCESS_TOKEN", file=sys.stderr)
             sys.exit(1)
 
-        if not user_id or user_id == "your_line_user_id_here":
+        if not user_ids or "your_line_user_id_here" in user_ids:
             print("❌ 請在 .env 檔案中設定 LINE_USER_ID", file=sys.stderr)
             sys.exit(1)
 
         # 格式化訊息 - 添加來源標示
         formatted_message = f"🤖 Claude Code 通知\n\n{notification_message}"
 
-        # 發送 LINE 推播
-        success = send_line_notification(formatted_message, access_token, user_id)
+        # 發送 LINE 推播，多位接收者時同時發送
+        if len(user_ids) == 1:
+            success = send_line_notification(formatted_message, access_token, user_ids[0])
+        else:
+            import asyncio
+            results = asyncio.run(send_line_notifications(formatted_message, access_token, user_ids))
+            success = all(results)
 
         if success:
             print(f"✅ LINE 推播已發送")
@@ -1,5 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#     "notify-py",
+#     "orjson",
+# ]
+# ///
 """
 Post-Use Tool Hook: Desktop Notification for Tracked Files
 
@@ -8,10 +15,14 @@ when tracked files are modified.
 """
 
 import sys
-import json
 import os
 from pathlib import Path
-from notifypy import Notify
+
+try:
+    from orjson import JSONDecodeError, loads as json_loads
+except ImportError:
+    # 未安裝 orjson 時退回標準函式庫 json
+    from json import JSONDecodeError, loads as json_loads
 
 
 # 追蹤檔案清單 - 可根據需求修改
@@ -23,31 +34,54 @@ DEFAULT_TRACKED_FILES = [
     "README.md",
 ]
 
+# Parsed tracked files cache: (config file mtime, (tracked_paths, tracked_names))
+_tracked_cache: tuple[int | None, tuple[tuple[str, ...], set[str]]] | None = None
+
 
-def load_tracked_files() -> list[str]:
+def load_tracked_files() -> tuple[tuple[str, ...], set[str]]:
     """
     Load tracked files from configuration file or use default list.
 
+    The parsed result is cached for the module lifetime and only reloaded
+    when the configuration file's modification time changes.
+
     Returns:
-        List of file paths to track
+        Tuple of (normalized tracked paths, tracked file names) for fast lookups
     """
+    global _tracked_cache
+
     config_file = Path(__file__).parent / "tracked_files.txt"
 
-    if config_file.exists():
+    try:
+        mtime = config_file.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+
+    if _tracked_cache is not None and _tracked_cache[0] == mtime:
+        return _tracked_cache[1]
+
+    tracked_files = DEFAULT_TRACKED_FILES
+
+    if mtime is not None:
         try:
-            tracked_files = []
+            loaded = []
             with open(config_file, "r", encoding="utf-8") as f:
                 for line in f:
                     line = line.strip()
                     # Skip empty lines and comments
                     if line and not line.startswith("#"):
-                        tracked_files.append(line)
-            return tracked_files if tracked_files else DEFAULT_TRACKED_FILES
+                        loaded.append(line)
+            if loaded:
+                tracked_files = loaded
         except Exception as e:
             print(f"讀取追蹤檔案清單失敗，使用預設清單：{e}", file=sys.stderr)
-            return DEFAULT_TRACKED_FILES
-    else:
-        return DEFAULT_TRACKED_FILES
+
+    # Normalize once here; the paths are kept as a tuple so is_tracked_file can
+    # check every suffix with a single str.endswith call
+    tracked_paths = tuple(dict.fromkeys(t.replace('\\', '/') for t in tracked_files))
+    tracked_names = {Path(t).name for t in tracked_paths}
+    _tracked_cache = (mtime, (tracked_paths, tracked_names))
+    return _tracked_cache[1]
 
 
 def normalize_path(file_path: str, cwd: str) -> str:
@@ -61,57 +95,42 @@ def normalize_path(file_path: str, cwd: str) -> str:
     Returns:
         Normalized relative path
     """
-    try:
-        # Convert to Path object
-        path = Path(file_path)
-        cwd_path = Path(cwd)
-
-        # Try to get relative path
-        if path.is_absolute():
-            try:
-                relative_path = path.relative_to(cwd_path)
-                return str(relative_path).replace('\\', '/')
-            except ValueError:
-                # If path is not relative to cwd, use the filename
-                return path.name
-        else:
-            return str(path).replace('\\', '/')
-    except Exception:
-        # Fallback to the original path
-        return file_path
-
-
-def is_tracked_file(file_path: str, cwd: str, tracked_files: list[str]) -> bool:
+    # Plain string operations avoid building Path objects on every hook call
+    path = file_path.replace('\\', '/')
+
+    if not os.path.isabs(file_path):
+        return path.removeprefix('./')
+
+    # Try to get relative path
+    cwd_prefix = cwd.replace('\\', '/').rstrip('/') + '/'
+    if cwd and path.startswith(cwd_prefix):
+        return path[len(cwd_prefix):]
+
+    # If path is not relative to cwd, use the filename
+    return path.rsplit('/', 1)[-1]
+
+
+def is_tracked_file(file_path: str, cwd: str, tracked_paths: tuple[str, ...], tracked_names: set[str]) -> bool:
     """
     Check if the file is in the tracked files list.
 
     Args:
         file_path: The file path to check
         cwd: Current working directory
-        tracked_files: List of tracked file paths
+        tracked_paths: Tuple of normalized tracked file paths
+        tracked_names: Set of tracked file names
 
     Returns:
         True if the file is tracked, False otherwise
     """
     normalized_path = normalize_path(file_path, cwd)
 
-    # Check exact match or filename match
-    for tracked in tracked_files:
-        tracked_normalized = tracked.replace('\\', '/')
+    # Filename match
+    if normalized_path.rsplit('/', 1)[-1] in tracked_names:
+        return True
 
-        # Exact match
-        if normalized_path == tracked_normalized:
-            return True
-
-        # Filename match
-        if Path(normalized_path).name == Path(tracked_normalized).name:
-            return True
-
-        # Check if the path ends with the tracked path (for absolute paths)
-        if normalized_path.endswith(tracked_normalized):
-            return True
-
-    return False
+    # Exact match, or the path ends with the tracked path (for absolute paths)
+    return normalized_path.endswith(tracked_paths)
 
 
 def send_notification(file_path: str, tool_name: str):
@@ -125,6 +144,9 @@ def send_notification(file_path: str, tool_name: str):
     if not file_path:
         return
 
+    # 延遲載入 notifypy（會載入 GUI 相關模組），只有追蹤檔案被修改時才需要
+    from notifypy import Notify
+
     notification = Notify()
     notification.title = "Claude Code 檔案修改通知"
     notification.message = f"已修改追蹤檔案：{Path(file_path).name}\n工具：{tool_name}"
@@ -142,10 +164,10 @@ def main():
     """
     try:
         # Load tracked files list
-        tracked_files = load_tracked_files()
+        tracked_paths, tracked_names = load_tracked_files()
 
         # Read JSON data from stdin
-        hook_data = json.load(sys.stdin)
+        hook_data = json_loads(sys.stdin.buffer.read())
 
         # Extract relevant information
         tool_name = hook_data.get("tool_name", "")
@@ -166,11 +188,11 @@ def main():
             return
 
         # Check if the file is tracked
-        if is_tracked_file(file_path, cwd, tracked_files):
+        if is_tracked_file(file_path, cwd, tracked_paths, tracked_names):
             send_notification(file_path, tool_name)
             print(f"✓ 已發送通知：{Path(file_path).name}", file=sys.stderr)
 
-    except json.JSONDecodeError as e:
+    except JSONDecodeError as e:
         print(f"JSON 解析錯誤：{e}", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
@@ -1,48 +1,293 @@
 # 專案 - Todo 任務管理系統
 # 這個模組提供了一個簡單的命令列任務管理工具
-import json
+import copy
+import hashlib
+import os
+import socket
 import sys
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Dict, Optional
 
+import orjson
+
 # 配置設定 - 定義專案路徑和資料檔案位置
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
-TASKS_FILE = DATA_DIR / "tasks.json"  # 任務資料檔案位置
+TASKS_FILE = DATA_DIR / "tasks.json"  # 任務資料檔案位置（快照）
+LOG_FILE = DATA_DIR / "tasks.log"  # 任務操作紀錄檔，每行一筆 JSON 紀錄
+COMPACT_THRESHOLD = 200  # 操作紀錄累積超過此筆數時自動壓縮回快照
 DEFAULT_TASKS_DATA = {
     "tasks": [],
-    "next_id": 1
+    "next_id": 1,
+    "_total_count": 0,  # 任務總數，隨新增/刪除維護
+    "_completed_count": 0  # 已完成任務數，隨完成/刪除維護
 }
 
 
+def get_socket_path() -> Optional[Path]:
+    """取得常駐伺服器 (todo_server.py) 的 Unix socket 位置
+
+    socket 放在只有目前使用者可存取的 XDG_RUNTIME_DIR，檔名依資料目錄區分，
+    確保 CLI 只會連到服務同一份資料檔案的伺服器；未設定 XDG_RUNTIME_DIR 時不使用伺服器
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        return None
+
+    digest = hashlib.sha256(str(DATA_DIR.resolve()).encode("utf-8")).hexdigest()[:12]
+    return Path(runtime_dir) / f"todo-{digest}.sock"
+
+
+SOCKET_PATH = get_socket_path()  # 常駐伺服器的 socket 位置，None 表示不使用伺服器
+
+
+@dataclass(slots=True)
+class Task:
+    """任務資料，使用 slots 減少大量任務時的記憶體用量"""
+    id: int
+    title: str
+    description: str = ""
+    completed: bool = False
+    extra: Dict = field(default_factory=dict)  # 資料檔中其他未知欄位，儲存時原樣寫回
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Task":
+        """由任務字典建立 Task，未知欄位保留在 extra 中"""
+        return cls(
+            id=data["id"],
+            title=data["title"],
+            description=data.get("description", ""),
+            completed=data.get("completed", False),
+            extra={k: v for k, v in data.items() if k not in TASK_FIELDS},
+        )
+
+    def to_dict(self) -> Dict:
+        """轉換回任務字典，並合併 extra 中的額外欄位"""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "completed": self.completed,
+            **self.extra,
+        }
+
+
+TASK_FIELDS = ("id", "title", "description", "completed")
+
+
+def _json_default(obj):
+    """orjson 無法直接處理的物件：Task 轉為含額外欄位的字典"""
+    if isinstance(obj, Task):
+        return obj.to_dict()
+    raise TypeError(f"無法序列化的型別: {type(obj).__name__}")
+
+
+def dumps_json(obj, option: int = 0) -> bytes:
+    """以 orjson 序列化資料，Task 會連同 extra 欄位一起輸出"""
+    return orjson.dumps(obj, default=_json_default,
+                        option=option | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+
 class TodoManager:
-    """任務管理器"""
+    """任務管理器
+
+    資料由 tasks.json 快照與 tasks.log 操作紀錄組成：新增、完成、刪除只會在紀錄檔
+    附加一行，載入時在快照上重播紀錄，紀錄累積到一定數量後再壓縮回快照
+    """
 
     def __init__(self):
         """初始化任務管理器"""
         self.tasks_file = TASKS_FILE
+        self.log_file = LOG_FILE
+        self._data: Optional[Dict] = None  # 快取已解析的任務資料
+        self._cache_key: Optional[tuple] = None  # 快取對應的檔案狀態 (修改時間, 大小)
+        self._index: Dict[int, Task] = {}  # 任務 ID 到任務的索引
+        self._log_records = 0  # 操作紀錄檔中的紀錄筆數
         self._ensure_data_file()
 
     def _ensure_data_file(self):
         """確保資料檔案存在"""
         if not self.tasks_file.exists():
             self.tasks_file.parent.mkdir(parents=True, exist_ok=True)
-            self._save_data(DEFAULT_TASKS_DATA)
+            self._save_data(copy.deepcopy(DEFAULT_TASKS_DATA))
+            # 不保留剛寫入的空快照作為快取，若紀錄檔仍存在，第一次載入時才會重播
+            self.invalidate_cache()
+
+    def _get_cache_key(self) -> tuple:
+        """取得快照與紀錄檔的 (修改時間, 大小)，檔案不存在時為 None"""
+        key = []
+        for path in (self.tasks_file, self.log_file):
+            try:
+                st = os.stat(path)
+                key.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                key.append(None)
+        return tuple(key)
 
     def _load_data(self) -> Dict:
-        """載入任務資料"""
+        """載入任務資料
+
+        讀取 tasks.json 快照後重播 tasks.log 中的操作紀錄。
+        解析結果會快取在記憶體中，只有在檔案狀態改變時才重新讀取
+        """
+        key = self._get_cache_key()
+        if self._data is not None and key == self._cache_key:
+            return self._data
+
         try:
-            with open(self.tasks_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return DEFAULT_TASKS_DATA.copy()
+            with open(self.tasks_file, 'rb') as f:
+                data = orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            data = copy.deepcopy(DEFAULT_TASKS_DATA)
+
+        data["tasks"] = [Task.from_dict(t) for t in data["tasks"]]
+        self._set_data(data)
+        self._log_records = self._replay_log(data)
+        self._cache_key = key
+        return data
 
     def _save_data(self, data: Dict):
-        """儲存任務資料"""
-        with open(self.tasks_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """儲存完整的任務資料快照"""
+        # 先寫入暫存檔再以 os.replace 原子替換，避免寫入中斷導致資料檔損毀
+        # orjson 預設輸出 UTF-8，等同 ensure_ascii=False
+        tmp_file = self.tasks_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(dumps_json(data, option=orjson.OPT_INDENT_2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.tasks_file)
+
+        # 寫入後同步更新快取，避免下次呼叫重新讀取檔案
+        if data is not self._data:
+            self._set_data(data)
+        self._cache_key = self._get_cache_key()
+
+    def _set_data(self, data: Dict):
+        """設定快取資料並重建 ID 索引"""
+        self._index = {t.id: t for t in data["tasks"]}
+        # 舊版資料檔沒有統計計數，載入時補算一次
+        if "_total_count" not in data or "_completed_count" not in data:
+            data["_total_count"] = len(data["tasks"])
+            data["_completed_count"] = sum(1 for t in data["tasks"] if t.completed)
+        self._data = data
+
+    def _replay_log(self, data: Dict) -> int:
+        """在快照資料上重播操作紀錄，回傳紀錄筆數"""
+        try:
+            with open(self.log_file, 'rb') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return 0
+
+        count = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # 寫入中斷留下的不完整紀錄，略過
+                continue
+            self._apply_record(data, record)
+            count += 1
+
+        return count
+
+    def _apply_record(self, data: Dict, record: Dict):
+        """套用一筆操作紀錄，重複套用同一筆紀錄不會改變結果"""
+        op = record.get("op")
+        if op == "add":
+            task = Task.from_dict(record["task"])
+            existing = self._index.get(task.id)
+            if existing is None:
+                self._insert_task(data, task)
+            elif (existing.title, existing.description) != (task.title, task.description):
+                # 壓縮中斷時紀錄可能已包含在快照中（內容相同，直接略過）；內容不同代表 ID 衝突
+                print(f"警告：操作紀錄中的任務 ID {task.id} 與現有任務衝突，已略過: {task.title}",
+                      file=sys.stderr)
+        elif op == "complete":
+            self._complete_task(data, record["id"])
+        elif op == "delete":
+            self._delete_task(data, record["id"])
+
+    def _append_log(self, records: List[Dict]):
+        """將操作紀錄附加到紀錄檔，累積過多時自動壓縮"""
+        try:
+            payload = b"".join(dumps_json(r) + b"\n" for r in records)
+            with open(self.log_file, 'a+b') as f:
+                # 上次寫入中斷時最後一行沒有換行，先補上避免新紀錄接在不完整紀錄後面
+                size = f.seek(0, os.SEEK_END)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        payload = b"\n" + payload
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            # 寫入失敗時記憶體中的修改沒有落地，捨棄快取並以檔案內容為準
+            self.invalidate_cache()
+            raise
+
+        self._log_records += len(records)
+        if self._log_records >= COMPACT_THRESHOLD:
+            self.compact()
+        else:
+            self._cache_key = self._get_cache_key()
+
+    def invalidate_cache(self):
+        """捨棄記憶體中的快取，下次操作時重新從檔案載入"""
+        self._data = None
+
+    def compact(self):
+        """將操作紀錄壓縮回 tasks.json 快照並清除紀錄檔"""
+        data = self._load_data()
+        self._save_data(data)
+        self.log_file.unlink(missing_ok=True)
+        self._log_records = 0
+        self._cache_key = self._get_cache_key()
+
+    def _insert_task(self, data: Dict, task: Task):
+        """將任務加入記憶體中的資料並更新索引與計數"""
+        data["tasks"].append(task)
+        data["next_id"] = max(data["next_id"], task.id + 1)
+        data["_total_count"] += 1
+        if task.completed:
+            data["_completed_count"] += 1
+        self._index[task.id] = task
 
-    def add_task(self, title: str, description: str = "") -> Dict:
+    def _add_task(self, data: Dict, title: str, description: str) -> Task:
+        """在記憶體中的資料新增任務（不寫入檔案）"""
+        task = Task(id=data["next_id"], title=title, description=description)
+
+        self._insert_task(data, task)
+        return task
+
+    def _complete_task(self, data: Dict, task_id: int) -> bool:
+        """在記憶體中的資料標記任務完成（不寫入檔案）"""
+        task = self._index.get(task_id)
+        if task is None:
+            return False
+
+        if not task.completed:
+            task.completed = True
+            data["_completed_count"] += 1
+        return True
+
+    def _delete_task(self, data: Dict, task_id: int) -> bool:
+        """在記憶體中的資料刪除任務（不寫入檔案）"""
+        task = self._index.pop(task_id, None)
+        if task is None:
+            return False
+
+        data["tasks"] = [t for t in data["tasks"] if t is not task]
+        data["_total_count"] -= 1
+        if task.completed:
+            data["_completed_count"] -= 1
+        return True
+
+    def add_task(self, title: str, description: str = "") -> Task:
         """新增任務
 
         Args:
@@ -50,24 +295,14 @@ class TodoManager:
             description: 任務描述（選填）
 
         Returns:
-            新增的任務字典
+            新增的任務
         """
         data = self._load_data()
-
-        task = {
-            "id": data["next_id"],
-            "title": title,
-            "description": description,
-            "completed": False
-        }
-
-        data["tasks"].append(task)
-        data["next_id"] += 1
-
-        self._save_data(data)
+        task = self._add_task(data, title, description)
+        self._append_log([{"op": "add", "task": task}])
         return task
 
-    def list_tasks(self, show_completed: bool = True) -> List[Dict]:
+    def list_tasks(self, show_completed: bool = True) -> List[Task]:
         """列出所有任務
 
         Args:
@@ -81,52 +316,90 @@ class TodoManager:
 
         if not show_completed:
             # 過濾掉已完成的任務，只顯示進行中的
-            tasks = [t for t in tasks if not t["completed"]]
+            tasks = [t for t in tasks if not t.completed]
 
         return tasks
 
-    def get_task(self, task_id: int) -> Optional[Dict]:
+    def get_task(self, task_id: int) -> Optional[Task]:
         """取得特定任務"""
-        data = self._load_data()
-
-        for task in data["tasks"]:
-            if task["id"] == task_id:
-                return task
-
-        return None
+        self._load_data()
+        return self._index.get(task_id)
 
     def complete_task(self, task_id: int) -> bool:
         """標記任務為已完成"""
         data = self._load_data()
 
-        for task in data["tasks"]:
-            if task["id"] == task_id:
-                task["completed"] = True
-                self._save_data(data)
-                return True
+        # 任務已經完成時不需要寫入紀錄
+        task = self._index.get(task_id)
+        if task is not None and task.completed:
+            return True
+
+        if self._complete_task(data, task_id):
+            self._append_log([{"op": "complete", "id": task_id}])
+            return True
 
         return False
 
     def delete_task(self, task_id: int) -> bool:
         """刪除任務"""
         data = self._load_data()
-        original_length = len(data["tasks"])
-
-        data["tasks"] = [t for t in data["tasks"] if t["id"] != task_id]
 
-        if len(data["tasks"]) < original_length:
-            self._save_data(data)
+        if self._delete_task(data, task_id):
+            self._append_log([{"op": "delete", "id": task_id}])
             return True
 
         return False
 
+    def apply_batch(self, ops: List[Dict]) -> List:
+        """批次套用多個操作，只讀取資料一次，並以單次寫入附加所有操作紀錄
+
+        Args:
+            ops: 操作列表，每個操作為字典，例如
+                {"op": "add", "title": "...", "description": "..."}
+                {"op": "complete", "id": 1}
+                {"op": "delete", "id": 1}
+
+        Returns:
+            每個操作的結果列表（add 回傳新增的任務，complete/delete 回傳 bool）
+        """
+        data = self._load_data()
+        results = []
+        records = []
+
+        try:
+            for op in ops:
+                name = op.get("op") if isinstance(op, dict) else None
+                if name == "add":
+                    task = self._add_task(data, op["title"], op.get("description", ""))
+                    results.append(task)
+                    records.append({"op": "add", "task": task})
+                elif name in ("complete", "delete"):
+                    try:
+                        task_id = int(op["id"])
+                    except (TypeError, ValueError):
+                        raise ValueError(f"任務 ID 必須是數字: {op}") from None
+                    apply = self._complete_task if name == "complete" else self._delete_task
+                    ok = apply(data, task_id)
+                    results.append(ok)
+                    if ok:
+                        records.append({"op": name, "id": task_id})
+                else:
+                    raise ValueError(f"未知的批次操作: {op}")
+        except BaseException:
+            # 任何操作失敗時都捨棄記憶體中已修改的快取，確保與檔案內容一致
+            self.invalidate_cache()
+            raise
+
+        if records:
+            self._append_log(records)
+        return results
+
     def get_task_stats(self) -> Dict:
         """取得任務統計資訊"""
         data = self._load_data()
-        tasks = data["tasks"]
 
-        total = len(tasks)
-        completed = sum(1 for t in tasks if t["completed"])
+        total = data["_total_count"]
+        completed = data["_completed_count"]
         active = total - completed
 
         return {
@@ -137,12 +410,100 @@ class TodoManager:
         }
 
 
-def print_task(task: Dict):
+class TodoClient:
+    """常駐伺服器客戶端，提供與 TodoManager 相同的介面，透過 Unix socket 轉送請求"""
+
+    def __init__(self, sock: socket.socket):
+        """初始化客戶端
+
+        Args:
+            sock: 已連線到伺服器的 socket
+        """
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+
+    def _request(self, op: str, **params):
+        """送出一個請求並等待回應，每個請求與回應各佔一行 JSON"""
+        self._sock.sendall(orjson.dumps({"op": op, **params}) + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("伺服器已關閉連線")
+
+        reply = orjson.loads(line)
+        if not reply.get("ok"):
+            raise ValueError(reply.get("error"))
+        return reply.get("result")
+
+    def add_task(self, title: str, description: str = "") -> Task:
+        """新增任務"""
+        return Task.from_dict(self._request("add", title=title, description=description))
+
+    def list_tasks(self, show_completed: bool = True) -> List[Task]:
+        """列出所有任務"""
+        return [Task.from_dict(t) for t in self._request("list", show_completed=show_completed)]
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """取得特定任務"""
+        task = self._request("get", id=task_id)
+        return Task.from_dict(task) if task is not None else None
+
+    def complete_task(self, task_id: int) -> bool:
+        """標記任務為已完成"""
+        return self._request("complete", id=task_id)
+
+    def delete_task(self, task_id: int) -> bool:
+        """刪除任務"""
+        return self._request("delete", id=task_id)
+
+    def apply_batch(self, ops: List[Dict]) -> List:
+        """批次套用多個操作"""
+        results = self._request("batch", ops=ops)
+        return [Task.from_dict(r) if isinstance(r, dict) else r for r in results]
+
+    def get_task_stats(self) -> Dict:
+        """取得任務統計資訊"""
+        return self._request("stats")
+
+    def compact(self):
+        """將操作紀錄壓縮回快照"""
+        return self._request("compact")
+
+    def close(self):
+        """關閉連線"""
+        self._reader.close()
+        self._sock.close()
+
+
+def connect_todo_server(path: Optional[Path] = SOCKET_PATH) -> Optional[TodoClient]:
+    """嘗試連線到常駐伺服器，伺服器未啟動、平台不支援或 socket 不屬於目前使用者時回傳 None"""
+    if path is None or not hasattr(socket, "AF_UNIX") or not hasattr(os, "getuid"):
+        return None
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    # 只連線到目前使用者自己啟動的伺服器
+    if st.st_uid != os.getuid():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+
+    return TodoClient(sock)
+
+
+def print_task(task: Task):
     """列印單一任務"""
-    status = "[完成]" if task["completed"] else "[未完成]"
-    print(f"{status} [{task['id']}] {task['title']}")
-    if task.get("description"):
-        print(f"   描述: {task['description']}")
+    status = "[完成]" if task.completed else "[未完成]"
+    print(f"{status} [{task.id}] {task.title}")
+    if task.description:
+        print(f"   描述: {task.description}")
 
 
 def get_task_id_from_args() -> Optional[int]:
@@ -158,9 +519,36 @@ def get_task_id_from_args() -> Optional[int]:
         return None
 
 
+def read_batch_ops(path: Optional[str]) -> Optional[List[Dict]]:
+    """從 JSONL 檔案或 stdin 讀取批次操作，每行一個 JSON 物件"""
+    try:
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        else:
+            lines = sys.stdin.readlines()
+    except OSError as e:
+        print(f"錯誤：無法讀取批次檔案: {e}")
+        return None
+
+    ops = []
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            ops.append(orjson.loads(line))
+        except orjson.JSONDecodeError as e:
+            print(f"錯誤：第 {line_no} 行 JSON 解析失敗: {e}")
+            return None
+
+    return ops
+
+
 def main():
     """主程式"""
-    manager = TodoManager()
+    # 有常駐伺服器時交由伺服器處理，共用其記憶體快取；否則直接操作資料檔案
+    manager = connect_todo_server() or TodoManager()
 
     if len(sys.argv) < 2:
         print("用法:")
@@ -169,6 +557,9 @@ def main():
         print("  uv run src/todo.py list [--active]      - 列出未完成任務")
         print("  uv run src/todo.py complete <ID>        - 標記任務完成")
         print("  uv run src/todo.py delete <ID>          - 任務刪除")
+        print("  uv run src/todo.py batch [檔案.jsonl]   - 批次執行操作（未提供檔案則讀取 stdin）")
+        print("  uv run src/todo.py compact              - 將操作紀錄壓縮回 tasks.json")
+        print("  uv run src/todo_server.py               - 啟動常駐伺服器（CLI 會自動連線）")
         return
 
     command = sys.argv[1]
@@ -182,7 +573,7 @@ def main():
         description = sys.argv[3] if len(sys.argv) > 3 else ""
 
         task = manager.add_task(title, description)
-        print(f"已新增任務: [{task['id']}] {task['title']}")
+        print(f"已新增任務: [{task.id}] {task.title}")
 
     elif command == "list":
         show_completed = "--active" not in sys.argv
@@ -211,6 +602,23 @@ def main():
             else:
                 print(f"找不到任務: {task_id}")
 
+    elif command == "batch":
+        ops = read_batch_ops(sys.argv[2] if len(sys.argv) > 2 else None)
+        if ops is None:
+            return
+
+        try:
+            results = manager.apply_batch(ops)
+        except (KeyError, ValueError) as e:
+            print(f"錯誤：批次操作格式不正確: {e}")
+            return
+
+        print(f"已執行 {len(results)} 個批次操作")
+
+    elif command == "compact":
+        manager.compact()
+        print("已壓縮任務資料")
+
     else:
         print(f"未知的指令: {command}")
 
@@ -0,0 +1,131 @@
+# 專案 - Todo 任務管理常駐伺服器
+# 以單一常駐程序持有 TodoManager 與其記憶體快取，透過 Unix socket 同時服務多個 CLI 請求，
+# 省去每次操作都要啟動 Python 直譯器並重新載入資料檔案的成本
+import asyncio
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Dict
+
+import orjson
+
+from todo import SOCKET_PATH, TodoManager, connect_todo_server, dumps_json
+
+# 單一請求（一行 JSON）的大小上限；批次操作會整批放在同一行送出，需遠大於預設的 64 KiB
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+
+
+def dispatch(manager: TodoManager, request: Dict):
+    """依照請求中的 op 呼叫對應的 TodoManager 方法
+
+    Args:
+        manager: 任務管理器
+        request: 請求字典，例如 {"op": "add", "title": "..."}
+
+    Returns:
+        該操作的結果
+    """
+    if not isinstance(request, dict):
+        raise ValueError(f"請求格式不正確: {request}")
+
+    op = request.get("op")
+    if op == "add":
+        return manager.add_task(request["title"], request.get("description", ""))
+    if op == "list":
+        return manager.list_tasks(show_completed=request.get("show_completed", True))
+    if op == "get":
+        return manager.get_task(int(request["id"]))
+    if op == "complete":
+        return manager.complete_task(int(request["id"]))
+    if op == "delete":
+        return manager.delete_task(int(request["id"]))
+    if op == "batch":
+        return manager.apply_batch(request["ops"])
+    if op == "stats":
+        return manager.get_task_stats()
+    if op == "compact":
+        return manager.compact()
+
+    raise ValueError(f"未知的操作: {op}")
+
+
+async def handle_client(manager: TodoManager, reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter):
+    """處理單一連線，每行一個 JSON 請求，依序回覆一行 JSON 結果"""
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except (ValueError, asyncio.LimitOverrunError) as e:
+                # 請求超過大小上限，StreamReader 已丟棄該段資料，回覆錯誤後繼續服務
+                reply = {"ok": False, "error": f"請求過大: {e}"}
+                writer.write(dumps_json(reply) + b"\n")
+                await writer.drain()
+                continue
+
+            if not line:
+                break
+
+            try:
+                result = dispatch(manager, orjson.loads(line))
+                reply = {"ok": True, "result": result}
+            except Exception as e:
+                # 任何錯誤都回覆給客戶端而不中斷連線，並捨棄可能只套用一半的快取
+                manager.invalidate_cache()
+                reply = {"ok": False, "error": str(e)}
+
+            writer.write(dumps_json(reply) + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(path: Path):
+    """啟動 Unix socket 伺服器並持續服務"""
+    # TodoManager 的操作皆為同步且不會讓出事件迴圈，因此多個連線共用同一個實例是安全的
+    manager = TodoManager()
+
+    async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        await handle_client(manager, reader, writer)
+
+    server = await asyncio.start_unix_server(on_connect, path=str(path), limit=MAX_REQUEST_SIZE)
+    # 只允許目前使用者連線
+    os.chmod(path, 0o600)
+    print(f"Todo 伺服器已啟動: {path}")
+
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """主程式"""
+    if not hasattr(socket, "AF_UNIX"):
+        print("錯誤：此平台不支援 Unix socket")
+        sys.exit(1)
+
+    if SOCKET_PATH is None:
+        print("錯誤：未設定 XDG_RUNTIME_DIR，無法建立伺服器 socket")
+        sys.exit(1)
+
+    client = connect_todo_server(SOCKET_PATH)
+    if client is not None:
+        client.close()
+        print(f"錯誤：伺服器已在執行中: {SOCKET_PATH}")
+        sys.exit(1)
+
+    # 清除上次異常結束留下的 socket 檔案
+    SOCKET_PATH.unlink(missing_ok=True)
+
+    try:
+        asyncio.run(serve(SOCKET_PATH))
+    except KeyboardInterrupt:
+        print("Todo 伺服器已停止")
+    finally:
+        SOCKET_PATH.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# 任務管理器測試 - 操作紀錄重播、壓縮、資料檔初始化與未知欄位保留
+# 執行方式: uv run python -m unittest discover -s tests
+import contextlib
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import todo  # noqa: E402
+
+
+class TodoManagerLogTest(unittest.TestCase):
+    """tasks.json 快照 + tasks.log 操作紀錄的行為"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self._tmp.name)
+        self.tasks_file = self.data_dir / "tasks.json"
+        self.log_file = self.data_dir / "tasks.log"
+        patcher = mock.patch.multiple(todo, TASKS_FILE=self.tasks_file, LOG_FILE=self.log_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+
+    def titles(self, manager):
+        return [t.title for t in manager.list_tasks()]
+
+    def test_replay_log_in_new_process(self):
+        manager = todo.TodoManager()
+        manager.add_task("a")
+        manager.add_task("b", "描述")
+        manager.complete_task(1)
+        manager.delete_task(2)
+        manager.add_task("c")
+
+        reloaded = todo.TodoManager()
+        self.assertEqual(self.titles(reloaded), ["a", "c"])
+        self.assertTrue(reloaded.get_task(1).completed)
+        self.assertEqual(reloaded.get_task(3).id, 3)
+        self.assertEqual(reloaded.get_task_stats()["total"], 2)
+        self.assertEqual(reloaded.get_task_stats()["completed"], 1)
+
+    def test_compact_removes_log_and_keeps_tasks(self):
+        manager = todo.TodoManager()
+        manager.add_task("a")
+        manager.complete_task(1)
+        manager.compact()
+
+        self.assertFalse(self.log_file.exists())
+        reloaded = todo.TodoManager()
+        self.assertEqual(self.titles(reloaded), ["a"])
+        self.assertTrue(reloaded.get_task(1).completed)
+
+    def test_replay_after_interrupted_compaction_is_idempotent(self):
+        manager = todo.TodoManager()
+        manager.add_task("a")
+        manager.add_task("b")
+        # 模擬壓縮中斷：快照已寫入但紀錄檔尚未刪除
+        manager._save_data(manager._load_data())
+        self.assertTrue(self.log_file.exists())
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            reloaded = todo.TodoManager()
+            self.assertEqual(self.titles(reloaded), ["a", "b"])
+            self.assertEqual(reloaded.get_task_stats()["total"], 2)
+            reloaded.compact()
+
+        self.assertEqual(stderr.getvalue(), "")
+        self.assertEqual(self.titles(todo.TodoManager()), ["a", "b"])
+
+    def test_torn_last_line_is_skipped_and_fenced(self):
+        manager = todo.TodoManager()
+        manager.add_task("a")
+        with open(self.log_file, "ab") as f:
+            f.write(b'{"op":"add","task":{"id":2')
+
+        reloaded = todo.TodoManager()
+        self.assertEqual(self.titles(reloaded), ["a"])
+        reloaded.add_task("b")
+
+        self.assertEqual(self.titles(todo.TodoManager()), ["a", "b"])
+
+    def test_missing_snapshot_replays_existing_log(self):
+        todo.TodoManager().add_task("x")
+        self.tasks_file.unlink()
+
+        manager = todo.TodoManager()
+        task = manager.add_task("y")
+
+        self.assertEqual(task.id, 2)
+        self.assertEqual(self.titles(todo.TodoManager()), ["x", "y"])
+
+    def test_conflicting_add_record_warns(self):
+        manager = todo.TodoManager()
+        manager.add_task("a")
+        with open(self.log_file, "ab") as f:
+            f.write(b'{"op":"add","task":{"id":1,"title":"other","description":"","completed":false}}\n')
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            reloaded = todo.TodoManager()
+            self.assertEqual(self.titles(reloaded), ["a"])
+
+        self.assertIn("任務 ID 1", stderr.getvalue())
+
+    def test_unknown_task_fields_survive_compaction(self):
+        self.tasks_file.write_bytes(todo.orjson.dumps({
+            "tasks": [{"id": 1, "title": "a", "description": "", "completed": False, "priority": "high"}],
+            "next_id": 2,
+        }))
+
+        manager = todo.TodoManager()
+        manager.complete_task(1)
+        manager.compact()
+
+        saved = todo.orjson.loads(self.tasks_file.read_bytes())
+        self.assertEqual(saved["tasks"][0]["priority"], "high")
+        self.assertTrue(saved["tasks"][0]["completed"])
+        self.assertNotIn("extra", saved["tasks"][0])
+        self.assertEqual(todo.TodoManager().get_task(1).extra, {"priority": "high"})
+
+
+if __name__ == "__main__":
+    unittest.main()